@@ -2,45 +2,150 @@
 from __future__ import annotations
 
 import os
+import re
+import sys
 import json
+import functools
+import contextlib
+import threading
 import yaml
 import jsonschema
-from typing import Any
+from collections import Counter, OrderedDict, deque
+from copy import deepcopy
+from itertools import islice
+from typing import IO, Any, Callable, Iterator
+
+from ._compiler import Checker, UnsupportedSchema, compile_validator, format_message
+from ._datapath import compile_datapath, resolve_datapath
+
+try:
+    import fastjsonschema
+except ImportError:  # optional accelerator
+    fastjsonschema = None
+
+try:
+    import orjson
+except ImportError:  # optional accelerator
+    orjson = None
 
 __all__ = [
     "load_yaml_or_json",
     "load_file",
     "convert_yaml_to_jsonschema",
     "validate",
+    "is_valid",
+    "compile_schema",
+    "compile_datapath",
     "resolve_datapath",
     "search",
 ]
 
+# Opt-in code-generated validation backend (DATASPEC_FAST=1).
+_FAST_VALIDATION = fastjsonschema is not None and os.environ.get("DATASPEC_FAST") == "1"
+# Keywords fastjsonschema does not implement; such schemas stay on jsonschema.
+_FAST_UNSUPPORTED = frozenset({"$dynamicRef", "$dynamicAnchor", "unevaluatedProperties", "unevaluatedItems"})
+
+
+# Prefer the libyaml-backed C loader; fall back to the pure-Python one.
+class _YamlLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):  # type: ignore[misc]
+    """Safe loader that interns mapping keys.
+
+    Records of the same type then share their key strings, as they do with
+    the JSON parsers, instead of holding a copy of every key per record.
+    """
+
+    def construct_mapping(self, node: Any, deep: bool = False) -> dict[Any, Any]:
+        mapping = super().construct_mapping(node, deep)
+        return {sys.intern(k) if type(k) is str else k: v for k, v in mapping.items()}
+
+
+# Matched in place, so large documents are not copied just to sniff them.
+_JSON_START = re.compile(r"\s*[{\[]")
+_JSON_START_BYTES = re.compile(rb"\s*[{\[]")
+
+
+# orjson reads integers beyond 64 bits as floats; texts with a run of 19 or
+# more digits, which such integers need, are left to the json module.
+_LONG_DIGITS = re.compile(r"[0-9]{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"[0-9]{19}")
+
+
+def _loads_json(s: str | bytes) -> Any:
+    if orjson and not (_LONG_DIGITS_BYTES if isinstance(s, bytes) else _LONG_DIGITS).search(s):
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN and Infinity, which the json module accepts
+    return json.loads(s)
+
+
+def _parse_text(s: str | bytes) -> Any:
+    # JSON documents are objects or arrays; only those are worth trying with
+    # the much cheaper JSON parser before falling back to YAML.
+    if (_JSON_START_BYTES if isinstance(s, bytes) else _JSON_START).match(s):
+        try:
+            return _loads_json(s)
+        except ValueError:
+            pass
+    return yaml.load(s, Loader=_YamlLoader)
 
-def load_yaml_or_json(s: str) -> Any:
-    """Load YAML or JSON from a string."""
-    try:
-        return yaml.safe_load(s)
-    except Exception:
-        return json.loads(s)
 
+# Texts up to this length are cached; larger ones are usually data documents
+# that are loaded once and should not be kept alive by the cache.
+_LOAD_CACHE_MAX_CHARS = 1 << 16
 
-def load_file(filename: str, force_format: str | None = None) -> Any:
-    """Load YAML or JSON file as a Python object."""
-    ext = os.path.splitext(filename)[1].lower()
+_parse_cached = functools.lru_cache(maxsize=64)(_parse_text)
+
+
+def load_yaml_or_json(s: str | bytes, *, copy: bool = False) -> Any:
+    """Load YAML or JSON from a string, or from bytes in an encoding YAML detects.
+
+    Results for short texts are cached by content: loading the same text again
+    returns the same object, so it also reuses the validator compiled for a
+    schema. Pass ``copy=True`` to get a private copy that is safe to modify.
+    """
+    if len(s) > _LOAD_CACHE_MAX_CHARS:
+        return _parse_text(s)
+    result = _parse_cached(s)
+    return deepcopy(result) if copy else result
+
+
+def _file_format(name: Any, force_format: str | None) -> str | None:
+    """Return the format to load a file as, or None if it cannot be inferred."""
     if force_format:
-        fmt = force_format.lower()
-    elif ext in {".yaml", ".yml"}:
-        fmt = "yaml"
-    elif ext == ".json":
-        fmt = "json"
+        return force_format.lower()
+    ext = os.path.splitext(name)[1].lower() if isinstance(name, (str, os.PathLike)) else ""
+    if ext in {".yaml", ".yml"}:
+        return "yaml"
+    if ext == ".json":
+        return "json"
+    return None
+
+
+def load_file(filename: str | os.PathLike[str] | IO[Any], force_format: str | None = None) -> Any:
+    """Load YAML or JSON file as a Python object.
+
+    filename may also be an open file object, in text or binary mode. Its
+    format is taken from force_format, or else from its name if it has one,
+    or else detected from the content as in load_yaml_or_json.
+    """
+    if hasattr(filename, "read"):
+        fmt = _file_format(getattr(filename, "name", None), force_format)
+        if fmt is None:
+            content = filename.read()
+            return _parse_text(content.decode("utf-8") if isinstance(content, bytes) else content)
+        source: Any = contextlib.nullcontext(filename)
     else:
-        raise ValueError(f"Cannot infer file format from extension: {filename}")
-    with open(filename, "r") as f:
+        fmt = _file_format(filename, force_format)
+        if fmt is None:
+            raise ValueError(f"Cannot infer file format from extension: {filename}")
+        # Parsers read the raw bytes themselves: no intermediate decoded str copy.
+        source = open(filename, "rb", buffering=1 << 20)
+    with source as f:
         if fmt == "yaml":
-            return yaml.safe_load(f)
+            return yaml.load(f, Loader=_YamlLoader)
         if fmt == "json":
-            return json.load(f)
+            return _loads_json(f.read())
     raise ValueError(f"Unknown format: {fmt}")
 
 
@@ -55,81 +160,222 @@ def is_json_schema(schema_obj: Any) -> bool:
     return False
 
 
-def convert_yaml_to_jsonschema(yaml_schema: dict[str, Any]) -> dict[str, Any]:
-    """Convert a Yaml schema to JSON Schema."""
-
-    def error(msg: str) -> None:
-        raise ValueError(f"Schema error: {msg}")
-
-    def ref_to_json(ref: str) -> str:
-        return ref.replace("#/", "#/definitions/")
-
-    def convert_field(obj: Any, context: str | None = None) -> Any:
-        if not isinstance(obj, dict):
-            return obj
-        t = obj.get("type")
-        if t == "map":
-            keys = obj.get("keys")
-            values = obj.get("values")
-            if keys is None or values is None:
-                error(f"type: map must have keys and values: {context}")
-            assert isinstance(keys, dict)
-            assert isinstance(values, dict)
-            key_type = keys.get("type")
-            if key_type not in ("string", "integer"):
-                error(f"Map keys must be string or integer: {context}")
-            if key_type == "integer":
-                return {
-                    "type": "object",
-                    "patternProperties": {
-                        "^[0-9]+$": convert_field(values, context=f"{context} (map values)")
-                    },
-                    "additionalProperties": False,
-                }
-            return {
-                "type": "object",
-                "additionalProperties": convert_field(values, context=f"{context} (map values)")
-            }
-        if t == "array":
-            items = obj.get("items")
-            if not items:
-                error(f"type: array must have items: {context}")
-            return {"type": "array", "items": convert_field(items, context=f"{context} (array items)")}
-        if t in ("string", "integer", "number", "boolean"):
-            r = {"type": t}
-            if "description" in obj:
-                r["description"] = obj["description"]
-            return r
-        if t == "object":
-            if context is not None:
-                error("Generic 'object' as property is forbidden (use named types or map)")
-            properties = obj.get("properties")
-            if not properties:
-                error("type: object must have properties for named types")
-        elif "properties" in obj:
-            error("Inline object definitions are not allowed. Use $ref to named types.")
-        elif "$ref" in obj:
-            return {"$ref": ref_to_json(obj["$ref"])}
-        elif t == "null":
-            error("Null type is not supported.")
-        else:
-            error(f"Unsupported or missing type in {obj} (context: {context})")
-        return obj
+# Primitive conversions are shared between all converted schemas.
+_PRIM = {t: {"type": t} for t in ("string", "integer", "number", "boolean")}
+
+
+def _schema_error(msg: str) -> None:
+    raise ValueError(f"Schema error: {msg}")
+
+
+def _ref_to_json(ref: str) -> str:
+    return ref.replace("#/", "#/definitions/")
+
+
+_Pending = deque[tuple[Any, Any, Any, str | None]]
+
+
+def _conv_map(obj: dict[str, Any], context: str | None, pending: _Pending) -> Any:
+    keys = obj.get("keys")
+    values = obj.get("values")
+    if keys is None or values is None:
+        _schema_error(f"type: map must have keys and values: {context}")
+    assert isinstance(keys, dict)
+    assert isinstance(values, dict)
+    key_type = keys.get("type")
+    if key_type not in ("string", "integer"):
+        _schema_error(f"Map keys must be string or integer: {context}")
+    if key_type == "integer":
+        patterns: dict[str, Any] = {}
+        pending.append((patterns, "^[0-9]+$", values, f"{context} (map values)"))
+        return {"type": "object", "patternProperties": patterns, "additionalProperties": False}
+    out: dict[str, Any] = {"type": "object"}
+    pending.append((out, "additionalProperties", values, f"{context} (map values)"))
+    return out
+
+
+def _conv_array(obj: dict[str, Any], context: str | None, pending: _Pending) -> Any:
+    items = obj.get("items")
+    if not items:
+        _schema_error(f"type: array must have items: {context}")
+    out: dict[str, Any] = {"type": "array"}
+    pending.append((out, "items", items, f"{context} (array items)"))
+    return out
+
+
+def _conv_prim(obj: dict[str, Any], context: str | None, pending: _Pending) -> Any:
+    t = obj["type"]
+    if "description" in obj:
+        return {"type": t, "description": obj["description"]}
+    return _PRIM[t]
+
+
+def _conv_object(obj: dict[str, Any], context: str | None, pending: _Pending) -> Any:
+    if context is not None:
+        _schema_error("Generic 'object' as property is forbidden (use named types or map)")
+    if not obj.get("properties"):
+        _schema_error("type: object must have properties for named types")
+    return obj
+
+
+# Converters for nodes with a known "type"; anything else is handled below.
+_HANDLERS = {
+    "map": _conv_map,
+    "array": _conv_array,
+    "string": _conv_prim,
+    "integer": _conv_prim,
+    "number": _conv_prim,
+    "boolean": _conv_prim,
+    "object": _conv_object,
+}
+
+
+def _convert_node(obj: Any, context: str | None, pending: _Pending) -> Any:
+    """Convert a single schema node.
+
+    Child nodes are not converted here: a ``(container, key, child, context)``
+    entry is queued on ``pending`` for each of them instead.
+    """
+    if not isinstance(obj, dict):
+        _schema_error(f"Type definition must be a mapping: {obj!r} (context: {context})")
+    t = obj.get("type")
+    handler = _HANDLERS.get(t) if isinstance(t, str) else None
+    if handler is not None:
+        return handler(obj, context, pending)
+    if "properties" in obj:
+        _schema_error("Inline object definitions are not allowed. Use $ref to named types.")
+    elif "$ref" in obj:
+        return {"$ref": _ref_to_json(obj["$ref"])}
+    elif t == "null":
+        _schema_error("Null type is not supported.")
+    else:
+        _schema_error(f"Unsupported or missing type in {obj} (context: {context})")
+    return obj
+
+
+def _convert_field(obj: Any, context: str | None = None) -> Any:
+    """Convert a property definition, walking nested items/values iteratively."""
+    root: dict[None, Any] = {}
+    pending: _Pending = deque([(root, None, obj, context)])
+    while pending:
+        container, key, node, ctx = pending.popleft()
+        container[key] = _convert_node(node, ctx, pending)
+    return root[None]
+
+
+# Definitions referenced at most this many times (and not recursively) are
+# copied into their use sites, so validation does not have to chase $refs.
+_INLINE_MAX_REFS = 3
+# Largest definition, in schema nodes once its own inlined references are
+# expanded, that is still inlined. Each inlined $ref then adds a bounded
+# number of nodes, so nested inlining cannot blow the schema up.
+_INLINE_MAX_NODES = 64
+
+
+def _ref_children(node: Any) -> Iterator[tuple[Any, Any, str]]:
+    """Yield ``(container, key, ref)`` for every $ref node below node."""
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        children = current.items() if isinstance(current, dict) else enumerate(current)
+        for key, child in children:
+            if isinstance(child, dict) and "$ref" in child:
+                yield current, key, child["$ref"]
+            elif isinstance(child, (dict, list)):
+                stack.append(child)
+
+
+def _count_nodes(node: Any) -> int:
+    """Count the schema nodes below node, $refs excluded."""
+    count = 0
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, dict):
+            if "$ref" not in current:
+                count += 1
+                stack.extend(current.values())
+        elif isinstance(current, list):
+            stack.extend(current)
+    return count
+
+
+def _inline_definitions(json_schema: dict[str, Any]) -> None:
+    """Inline small, rarely used, non-recursive definitions into their use sites."""
+    definitions = json_schema["definitions"]
+    targets = {f"#/definitions/{name}": name for name in definitions}
+    sites = {
+        name: [(container, key, targets[ref]) for container, key, ref in _ref_children(body) if ref in targets]
+        for name, body in definitions.items()
+    }
+    root_sites = [(c, k, targets[ref]) for c, k, ref in _ref_children(json_schema["properties"]) if ref in targets]
+    counts = Counter(name for _, _, name in root_sites)
+    for body_sites in sites.values():
+        counts.update(name for _, _, name in body_sites)
+
+    def recursive(name: str) -> bool:
+        seen: set[str] = set()
+        stack = [used for _, _, used in sites[name]]
+        while stack:
+            current = stack.pop()
+            if current == name:
+                return True
+            if current not in seen:
+                seen.add(current)
+                stack.extend(used for _, _, used in sites[current])
+        return False
+
+    # Visit definitions children first (iterative post-order), so a body's
+    # inlinable references are already expanded when it is sized and when it
+    # is substituted into its own use sites.
+    order: list[str] = []
+    visited: set[str] = set()
+    for start in definitions:
+        if start in visited:
+            continue
+        visited.add(start)
+        stack = [(start, iter(sites[start]))]
+        while stack:
+            name, pending = stack[-1]
+            for _, _, used in pending:
+                if used not in visited:
+                    visited.add(used)
+                    stack.append((used, iter(sites[used])))
+                    break
+            else:
+                stack.pop()
+                order.append(name)
 
+    size: dict[str, int] = {}
+    inline: set[str] = set()
+    for name in order:
+        size[name] = _count_nodes(definitions[name]) + sum(
+            size[used] for _, _, used in sites[name] if used in inline
+        )
+        if counts[name] <= _INLINE_MAX_REFS and size[name] <= _INLINE_MAX_NODES and not recursive(name):
+            inline.add(name)
+
+    for container, key, used in root_sites + [site for name in order for site in sites[name]]:
+        if used in inline:
+            # Shared rather than copied: inlined definitions are not
+            # recursive, so the schema stays acyclic.
+            container[key] = definitions[used]
+
+
+def _convert_yaml_to_jsonschema(yaml_schema: dict[str, Any]) -> dict[str, Any]:
     definitions: dict[str, Any] = {}
     for name, typ in yaml_schema.items():
         if name == "<<root>>":
             continue
         if not isinstance(typ, dict) or "properties" not in typ:
-            error(f"Named type '{name}' must have properties")
+            _schema_error(f"Named type '{name}' must have properties")
         out: dict[str, Any] = {"type": "object", "properties": {}, "additionalProperties": False}
         required: list[str] = []
         for prop, propdef in typ["properties"].items():
             if not propdef.get("optional", False):
                 required.append(prop)
-            pdef = dict(propdef)
-            pdef.pop("optional", None)
-            out["properties"][prop] = convert_field(pdef, context=f"{name}.{prop}")
+            pdef = {k: v for k, v in propdef.items() if k != "optional"}
+            out["properties"][prop] = _convert_field(pdef, context=f"{name}.{prop}")
         if required:
             out["required"] = required
         definitions[name] = out
@@ -148,117 +394,210 @@ def convert_yaml_to_jsonschema(yaml_schema: dict[str, Any]) -> dict[str, Any]:
         "required": root_required,
     }
     for prop, propdef in root_props.items():
-        pdef = dict(propdef)
-        pdef.pop("optional", None)
-        json_schema["properties"][prop] = convert_field(pdef, context=f"<<root>>.{prop}")
+        pdef = {k: v for k, v in propdef.items() if k != "optional"}
+        json_schema["properties"][prop] = _convert_field(pdef, context=f"<<root>>.{prop}")
+    _inline_definitions(json_schema)
     return json_schema
 
 
-def validate(data: Any, schema: Any, *, raise_error: bool = True) -> bool | str:
-    """Validate data against schema. Returns True or error string."""
+# Compiled validators and converted schemas, keyed by the id() of the schema
+# they were built from. Each entry keeps its schema alive so the id cannot be
+# reused while it is cached.
+_CACHE_SIZE = 128
+_VALIDATOR_CACHE: OrderedDict[int, tuple[Any, Any]] = OrderedDict()
+_CONVERSION_CACHE: OrderedDict[int, tuple[Any, Any]] = OrderedDict()
+_FAST_CACHE: OrderedDict[int, tuple[Any, Any]] = OrderedDict()
+_CHECKER_CACHE: OrderedDict[int, tuple[Any, Any]] = OrderedDict()
+# Guards the LRU bookkeeping above, which is not atomic across threads.
+_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(cache: OrderedDict[int, tuple[Any, Any]], obj: Any) -> Any:
+    with _CACHE_LOCK:
+        entry = cache.get(id(obj))
+        if entry is None:
+            return None
+        cache.move_to_end(id(obj))
+        return entry[1]
+
+
+def _cache_put(cache: OrderedDict[int, tuple[Any, Any]], obj: Any, value: Any) -> Any:
+    with _CACHE_LOCK:
+        cache[id(obj)] = (obj, value)
+        cache.move_to_end(id(obj))
+        if len(cache) > _CACHE_SIZE:
+            cache.popitem(last=False)
+    return value
+
+
+def convert_yaml_to_jsonschema(yaml_schema: dict[str, Any]) -> dict[str, Any]:
+    """Convert a Yaml schema to JSON Schema.
+
+    The result is cached per schema object: converting the same schema again
+    returns the same JSON Schema object, which lets validation reuse its
+    compiled validator. Neither object should be modified afterwards.
+    """
+    json_schema = _cache_get(_CONVERSION_CACHE, yaml_schema)
+    if json_schema is None:
+        json_schema = _cache_put(_CONVERSION_CACHE, yaml_schema, _convert_yaml_to_jsonschema(yaml_schema))
+    return json_schema
+
+
+def _get_validator(json_schema: Any, check_schema: bool = True) -> Any:
+    validator = _cache_get(_VALIDATOR_CACHE, json_schema)
+    if validator is None:
+        cls = jsonschema.validators.validator_for(json_schema)
+        if check_schema:
+            cls.check_schema(json_schema)
+        validator = _cache_put(_VALIDATOR_CACHE, json_schema, cls(json_schema))
+    return validator
+
+
+def _fast_supported(schema_obj: Any) -> bool:
+    if isinstance(schema_obj, dict):
+        if not _FAST_UNSUPPORTED.isdisjoint(schema_obj):
+            return False
+        return all(_fast_supported(v) for v in schema_obj.values())
+    if isinstance(schema_obj, list):
+        return all(_fast_supported(v) for v in schema_obj)
+    return True
+
+
+def _get_fast_validator(json_schema: Any) -> Any:
+    """Return a fastjsonschema function for the schema, or False if unsupported."""
+    fn = _cache_get(_FAST_CACHE, json_schema)
+    if fn is None:
+        if _fast_supported(json_schema):
+            fn = fastjsonschema.compile(json_schema, use_default=False)
+        else:
+            fn = False
+        _cache_put(_FAST_CACHE, json_schema, fn)
+    return fn
+
+
+_SNIPPET_ITEMS = 8
+_SNIPPET_DEPTH = 3
+
+
+def _snippet_preview(instance: Any, depth: int = _SNIPPET_DEPTH) -> Any:
+    """Trim a failing value to a few items per level before it is serialized."""
+    if isinstance(instance, dict):
+        if depth == 0:
+            return {"__truncated__": True} if instance else {}
+        preview = {k: _snippet_preview(v, depth - 1) for k, v in islice(instance.items(), _SNIPPET_ITEMS)}
+        if len(instance) > _SNIPPET_ITEMS:
+            preview["__truncated__"] = True
+        return preview
+    if isinstance(instance, list):
+        if depth == 0:
+            return ["..."] if instance else []
+        items = [_snippet_preview(v, depth - 1) for v in instance[:_SNIPPET_ITEMS]]
+        if len(instance) > _SNIPPET_ITEMS:
+            items.append("...")
+        return items
+    return instance
+
+
+def _report_failure(reason: Any, path: Any, instance: Any, raise_error: bool) -> str:
+    msg = f"Validation failed: {format_message(reason, instance)}\n"
+    if path:
+        msg += "Location: " + " -> ".join(str(p) for p in path) + "\n"
+    else:
+        msg += "Location: (root)\n"
+    instance = _snippet_preview(instance)
+    snippet = None
+    if orjson:
+        try:
+            snippet = orjson.dumps(instance, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits
+    if snippet is None:
+        snippet = json.dumps(instance, indent=2, ensure_ascii=False)
+    if len(snippet) > 400:
+        snippet = snippet[:400] + "... (truncated)"
+    msg += "Data snippet: " + snippet
+    if raise_error:
+        raise ValueError(msg)
+    return msg
+
+
+def _make_checker(schema: Any) -> Checker:
     json_schema = schema if is_json_schema(schema) else convert_yaml_to_jsonschema(schema)
-    try:
-        jsonschema.validate(instance=data, schema=json_schema)
+    if json_schema is not schema:
+        # Converted from the Yaml format: generate dedicated Python code
+        try:
+            return compile_validator(json_schema)
+        except UnsupportedSchema:
+            pass
+    if _FAST_VALIDATION:
+        fast = _get_fast_validator(json_schema)
+        if fast:
+
+            def check_fast(data: Any) -> tuple[str, Any, Any] | None:
+                try:
+                    fast(data)
+                except fastjsonschema.JsonSchemaValueException as ex:
+                    # ex.path starts with the "data" placeholder for the root
+                    return ex.message, ex.path[1:], ex.value
+                return None
+
+            return check_fast
+    # Schemas produced by the converter are valid by construction; checking
+    # them against the metaschema would dominate one-shot validations.
+    validator = _get_validator(json_schema, check_schema=json_schema is schema)
+
+    def check(data: Any) -> tuple[str, Any, Any] | None:
+        e = jsonschema.exceptions.best_match(validator.iter_errors(data))
+        return None if e is None else (e.message, e.absolute_path, e.instance)
+
+    return check
+
+
+def _get_checker(schema: Any) -> Checker:
+    checker = _cache_get(_CHECKER_CACHE, schema)
+    if checker is None:
+        checker = _cache_put(_CHECKER_CACHE, schema, _make_checker(schema))
+    return checker
+
+
+def compile_schema(schema: Any) -> Callable[[Any], bool | str]:
+    """Compile schema into a function taking data and returning True or an error string.
+
+    The function behaves like ``validate(data, schema, raise_error=False)``
+    without looking the schema up on every call.
+    """
+    check = _get_checker(schema)
+
+    def validator(data: Any) -> bool | str:
+        error = check(data)
+        if error is None:
+            return True
+        return _report_failure(*error, raise_error=False)
+
+    return validator
+
+
+def validate(data: Any, schema: Any, *, raise_error: bool = True) -> bool | str:
+    """Validate data against schema. Returns True or error string.
+
+    Schemas in the Yaml format are compiled to Python code, which reports the
+    first error it finds. JSON Schemas are validated with jsonschema, or with
+    fastjsonschema's generated code when ``DATASPEC_FAST=1`` is set and it is
+    installed. The compiled validator is cached per schema object, so a schema
+    must not be modified after it has been used for validation.
+    """
+    error = _get_checker(schema)(data)
+    if error is None:
         return True
-    except jsonschema.ValidationError as e:
-        msg = f"Validation failed: {e.message}\n"
-        if e.absolute_path:
-            msg += "Location: " + " -> ".join(str(p) for p in e.absolute_path) + "\n"
-        else:
-            msg += "Location: (root)\n"
-        if hasattr(e, "instance"):
-            snippet = json.dumps(e.instance, indent=2, ensure_ascii=False)
-            if len(snippet) > 400:
-                snippet = snippet[:400] + "... (truncated)"
-            msg += "Data snippet: " + snippet
-        if raise_error:
-            raise ValueError(msg)
-        return msg
-
-
-def _split_segments(path: str) -> list[str]:
-    segments: list[str] = []
-    buf = ""
-    level = 0
-    for ch in path:
-        if ch in "./" and level == 0:
-            if buf:
-                segments.append(buf)
-                buf = ""
-            continue
-        buf += ch
-        if ch == "[":
-            level += 1
-        elif ch == "]":
-            level -= 1
-    if buf:
-        segments.append(buf)
-    return segments
-
-
-def _parse_segment(seg: str) -> tuple[str | None, list[str]]:
-    name = None
-    selectors: list[str] = []
-    i = 0
-    while i < len(seg) and seg[i] != "[":
-        name = seg[:i + 1]
-        i += 1
-    if name is None:
-        name = ""
-    rest = seg[len(name):]
-    while rest:
-        if not rest.startswith("["):
-            raise ValueError(f"Malformed segment: {seg}")
-        j = rest.find("]")
-        if j == -1:
-            raise ValueError(f"Malformed segment: {seg}")
-        selectors.append(rest[1:j])
-        rest = rest[j + 1:]
-    return name, selectors
-
-
-def resolve_datapath(data: Any, path: str) -> Any:
-    """Resolve a DataPath expression against data."""
-    current = data
-    for raw_seg in _split_segments(path):
-        name, selectors = _parse_segment(raw_seg)
-        if name:
-            if isinstance(current, dict) and name in current:
-                current = current[name]
-            else:
-                raise KeyError(name)
-        for sel in selectors:
-            if sel.isdigit() or (sel.startswith("-") and sel[1:].isdigit()):
-                idx = int(sel)
-                if isinstance(current, list):
-                    current = current[idx]
-                else:
-                    raise IndexError(f"Index {idx} on non-list")
-            elif sel.startswith("\"") or sel.startswith("'"):
-                key = yaml.safe_load(sel)
-                if isinstance(current, dict) and key in current:
-                    current = current[key]
-                else:
-                    raise KeyError(key)
-            elif "=" in sel:
-                field, value = sel.split("=", 1)
-                if value.startswith("\"") or value.startswith("'"):
-                    value = yaml.safe_load(value)
-                elif value.isdigit() or (value.startswith("-") and value[1:].isdigit()):
-                    value = int(value)
-                for item in current:
-                    if isinstance(item, dict) and item.get(field) == value:
-                        current = item
-                        break
-                else:
-                    raise KeyError(f"No element with {field}={value}")
-            else:
-                key = sel
-                if isinstance(current, dict) and key in current:
-                    current = current[key]
-                else:
-                    raise KeyError(key)
-    return current
+    return _report_failure(*error, raise_error)
+
+
+def is_valid(data: Any, schema: Any) -> bool:
+    """Return whether data is valid against schema.
+
+    Cheaper than ``validate`` for invalid data, since no error report is built.
+    """
+    return _get_checker(schema)(data) is None
 
 
 def search(data: Any, path: str) -> Any:
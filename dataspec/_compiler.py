@@ -0,0 +1,411 @@
+# Validator code generation for converted DataSpec schemas.
+#
+# Converted schemas only use a small part of JSON Schema: named object types,
+# arrays, string- and integer-keyed maps, the four primitive types and $refs
+# to definitions. compile_validator() turns such a schema into the source of
+# plain Python functions made of nested checks, so validating data no longer
+# walks the schema at all. References are resolved while generating: the
+# checks of a referenced type are inlined, and only recursive types become
+# functions, fed from a work stack instead of calling themselves. Error
+# messages follow jsonschema's wording; the first error found is reported.
+from __future__ import annotations
+
+import re
+import heapq
+import numbers
+import reprlib
+import functools
+import itertools
+from typing import Any, Callable
+
+# An error is (reason, path, instance); None means the data is valid. The
+# reason is the message, or for generated code a tuple it is only formatted
+# from by format_message() when an error is reported, so checks that merely
+# need a yes or no never pay for the repr of a large failing value.
+Checker = Callable[[Any], "tuple[str | tuple[Any, ...], Any, Any] | None"]
+
+_PRIMITIVES = ("string", "integer", "number", "boolean")
+_INT_KEY_PATTERN = "^[0-9]+$"
+# Deeper nodes are moved into a function of their own, which keeps generated
+# code within CPython's limits of 20 statically nested blocks (each loop is
+# one) and 100 indentation levels.
+_MAX_LOOPS = 18
+_MAX_INDENT = 48
+# Nodes nested deeper than this in one function also get their own function,
+# which bounds the generator's own recursion.
+_MAX_DEPTH = 64
+# A schema node reached from several places (a $ref target, or a definition
+# the converter inlined as a shared dict) has its checks inlined at most this
+# many times; further uses get a function of their own. Each node's code is
+# therefore emitted a bounded number of times and the generated code stays
+# linear in the size of the schema.
+_MAX_INLINE = 8
+
+
+# Exact Python types that certainly satisfy a primitive type, and the array
+# length from which checking them all at once beats a loop.
+_EXACT_TYPES = {
+    "string": frozenset({str}),
+    "integer": frozenset({int}),
+    "number": frozenset({int, float}),
+    "boolean": frozenset({bool}),
+}
+_HOMOGENEOUS_MIN = 16
+
+
+def _exact_types(node: Any) -> frozenset[type] | None:
+    if isinstance(node, dict) and node.keys() - {"description"} == {"type"}:
+        return _EXACT_TYPES.get(node["type"])
+    return None
+
+
+def _is_integer(value: Any) -> bool:
+    # As in JSON Schema: bools are not integers, integral floats are.
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) or (isinstance(value, float) and value.is_integer())
+
+
+# Expressions that are true when {v} is NOT of the JSON Schema type; the
+# Python types are resolved here so generated code never compares names.
+# Numbers are tested for their exact builtin types first, which settles the
+# common case without a call or an ABC isinstance() check.
+_TYPE_MISMATCH = {
+    "string": "not isinstance({v}, str)",
+    "integer": "type({v}) is not int and not _is_integer({v})",
+    "number": (
+        "type({v}) is not float and type({v}) is not int"
+        " and (isinstance({v}, bool) or not isinstance({v}, _Number))"
+    ),
+    "boolean": "not isinstance({v}, bool)",
+    "array": "not isinstance({v}, list)",
+    "object": "not isinstance({v}, dict)",
+}
+
+
+_MISSING = object()
+
+
+class UnsupportedSchema(Exception):
+    """The schema uses constructs the code generator does not handle."""
+
+
+class _BoundedRepr(reprlib.Repr):
+    def repr_dict(self, x: dict[Any, Any], level: int) -> str:
+        # reprlib sorts the whole dict first; take the first keys in insertion
+        # order instead, as repr() shows them.
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{" + self.fillvalue + "}"
+        pieces = [
+            f"{self.repr1(key, level - 1)}: {self.repr1(value, level - 1)}"
+            for key, value in itertools.islice(x.items(), self.maxdict)
+        ]
+        if len(x) > self.maxdict:
+            pieces.append(self.fillvalue)
+        return "{" + ", ".join(pieces) + "}"
+
+
+# Values in messages are shown with a bounded repr, so the message stays
+# short however large the failing value is.
+_REPR = _BoundedRepr(
+    maxlevel=3,
+    maxtuple=8,
+    maxlist=8,
+    maxarray=8,
+    maxdict=8,
+    maxset=8,
+    maxfrozenset=8,
+    maxdeque=8,
+    maxstring=80,
+    maxlong=80,
+    maxother=80,
+)
+
+
+def _listing(extras: Any) -> str:
+    shown = heapq.nsmallest(_REPR.maxlist + 1, extras, key=str)
+    joined = ", ".join(_REPR.repr(extra) for extra in shown[: _REPR.maxlist])
+    return joined + ", ..." if len(shown) > _REPR.maxlist else joined
+
+
+def _additional_error(extras: Any) -> str:
+    verb = "was" if len(extras) == 1 else "were"
+    return f"Additional properties are not allowed ({_listing(extras)} {verb} unexpected)"
+
+
+def _pattern_error(extras: Any) -> str:
+    verb = "does" if len(extras) == 1 else "do"
+    return f"{_listing(extras)} {verb} not match any of the regexes: {_INT_KEY_PATTERN!r}"
+
+
+def format_message(reason: str | tuple[Any, ...], instance: Any) -> str:
+    """Return the error message for a reason reported by a checker."""
+    if isinstance(reason, str):
+        return reason
+    kind = reason[0]
+    if kind == "type":
+        return f"{_REPR.repr(instance)} is not of type {reason[1]!r}"
+    if kind == "additional":
+        return _additional_error(instance.keys() - reason[1])
+    return _pattern_error(reason[1])
+
+
+class _Generator:
+    def __init__(self, json_schema: dict[str, Any]) -> None:
+        definitions = json_schema.get("definitions", {})
+        self.targets = {f"#/definitions/{name}": body for name, body in definitions.items()}
+        self.namespace: dict[str, Any] = {
+            "_is_integer": _is_integer,
+            "_Number": numbers.Number,
+            "_INT_KEY": re.compile(_INT_KEY_PATTERN),
+            "_MISSING": _MISSING,
+            "_chain": itertools.chain.from_iterable,
+        }
+        self.sources: list[str] = []
+        self.pending: list[tuple[Any, str]] = []
+        self.depth = 0
+        self.shared = self.shared_nodes(json_schema)
+        self.node_functions: dict[int, str] = {}
+        self.inlining: set[int] = set()
+        self.inlined: dict[int, int] = {}
+        self.counter = itertools.count()
+
+    def shared_nodes(self, json_schema: dict[str, Any]) -> set[int]:
+        """Return the ids of composite schema nodes reached more than once."""
+        uses: dict[int, int] = {}
+        composite: set[int] = set()
+        stack: list[Any] = [{k: v for k, v in json_schema.items() if k != "definitions"}]
+        while stack:
+            node = stack.pop()
+            for child in node.values() if isinstance(node, dict) else node:
+                if isinstance(child, dict) and "$ref" in child:
+                    child = self.targets.get(child["$ref"], child)
+                if not isinstance(child, (dict, list)):
+                    continue
+                key = id(child)
+                uses[key] = uses.get(key, 0) + 1
+                if uses[key] == 1:
+                    stack.append(child)
+                    values = child.values() if isinstance(child, dict) else child
+                    if any(isinstance(v, (dict, list)) for v in values):
+                        composite.add(key)
+        # Leaves such as primitive types emit constant-size code; sharing
+        # them is harmless.
+        return {key for key in composite if uses[key] > 1}
+
+    def name(self, prefix: str) -> str:
+        return f"{prefix}{next(self.counter)}"
+
+    def const(self, value: Any) -> str:
+        name = self.name("_c")
+        self.namespace[name] = value
+        return name
+
+    def function(self, node: Any, fname: str | None = None) -> str:
+        """Queue a function validating node and return its name."""
+        fname = fname or self.name("_v")
+        self.pending.append((node, fname))
+        return fname
+
+    def emit_functions(self) -> None:
+        """Emit the source of all queued functions.
+
+        Functions take the value, the push method of the work stack and the
+        value's path link; see _run().
+        """
+        while self.pending:
+            node, fname = self.pending.pop()
+            lines = [f"def {fname}(v, push, p):"]
+            lines += self.emit(node, "v", [], 1, 0)
+            lines.append("    return None")
+            self.sources.append("\n".join(lines))
+
+    def node_function(self, node: dict[str, Any]) -> str:
+        if id(node) not in self.node_functions:
+            # Reserve the name first so recursive types find themselves.
+            self.node_functions[id(node)] = fname = self.name("_v")
+            self.function(node, fname)
+        return self.node_functions[id(node)]
+
+    def defer(self, fname: str, var: str, path: list[str], indent: int) -> list[str]:
+        """Queue the value in var for fname instead of calling it."""
+        link = f"(p, {_tuple(path)})" if path else "p"
+        return [f"{'    ' * indent}push(({fname}, {var}, {link}))"]
+
+    def check(self, node: Any, var: str, path: list[str], indent: int, loops: int) -> list[str]:
+        """Return the lines checking the value in ``var`` against node.
+
+        indent is the indentation level and loops the number of enclosing
+        for statements in the function being generated.
+        """
+        if not isinstance(node, dict):
+            raise UnsupportedSchema(node)
+        if "$ref" in node:
+            ref = node["$ref"]
+            if len(node) != 1 or ref not in self.targets:
+                raise UnsupportedSchema(node)
+            node = self.targets[ref]
+        key = id(node)
+        too_deep = indent > _MAX_INDENT or loops >= _MAX_LOOPS or self.depth >= _MAX_DEPTH
+        if key in self.shared:
+            count = self.inlined.get(key, 0)
+            if too_deep or key in self.node_functions or key in self.inlining or count >= _MAX_INLINE:
+                # Recursive or widely used nodes get a function of their own
+                return self.defer(self.node_function(node), var, path, indent)
+            self.inlined[key] = count + 1
+            self.inlining.add(key)
+            try:
+                return self.nested(node, var, path, indent, loops)
+            finally:
+                self.inlining.discard(key)
+        if too_deep:
+            return self.defer(self.function(node), var, path, indent)
+        return self.nested(node, var, path, indent, loops)
+
+    def nested(self, node: Any, var: str, path: list[str], indent: int, loops: int) -> list[str]:
+        self.depth += 1
+        try:
+            return self.emit(node, var, path, indent, loops)
+        finally:
+            self.depth -= 1
+
+    def emit(self, node: Any, var: str, path: list[str], indent: int, loops: int) -> list[str]:
+        """Return the checks of node itself, with its children going through check()."""
+        if not isinstance(node, dict):
+            raise UnsupportedSchema(node)
+        pad = "    " * indent
+
+        def fail(message: str) -> str:
+            return f"{pad}    return ({message}, {_tuple(path)}, {var})"
+
+        def type_check(t: str) -> list[str]:
+            return [f"{pad}if {_TYPE_MISMATCH[t].format(v=var)}:", fail(repr(("type", t)))]
+
+        t = node.get("type")
+        keys = node.keys() - {"description"}
+        if t in _PRIMITIVES and keys == {"type"}:
+            return type_check(t)
+
+        if t == "array" and keys == {"type", "items"}:
+            idx, item = self.name("i"), self.name("x")
+            lines = type_check("array")
+            items = node["items"]
+            exact = _exact_types(items)
+            homogeneous = None
+            if exact is not None:
+                # Arrays of primitives: one C-level pass over the element types
+                # accepts long homogeneous arrays; the loop below only runs for
+                # short arrays or to find the offending element.
+                homogeneous = f"set(map(type, {var})) <= {self.const(exact)}"
+            elif isinstance(items, dict) and items.keys() - {"description"} == {"type", "items"}:
+                exact = _exact_types(items["items"]) if items["type"] == "array" else None
+                if exact is not None:
+                    # Matrices: check the rows, then all their elements at once,
+                    # which also covers many short rows.
+                    homogeneous = (
+                        f"(set(map(type, {var})) <= {self.const(frozenset({list}))}"
+                        f" and set(map(type, _chain({var}))) <= {self.const(exact)})"
+                    )
+            if homogeneous:
+                lines.append(f"{pad}if len({var}) < {_HOMOGENEOUS_MIN} or not {homogeneous}:")
+                pad += "    "
+                indent += 1
+            lines.append(f"{pad}for {idx}, {item} in enumerate({var}):")
+            lines += self.check(items, item, path + [idx], indent + 1, loops + 1)
+            return lines
+
+        if t != "object":
+            raise UnsupportedSchema(node)
+
+        if keys == {"type", "additionalProperties"} and isinstance(node["additionalProperties"], dict):
+            # String-keyed map
+            key, value = self.name("k"), self.name("x")
+            lines = type_check("object")
+            lines.append(f"{pad}for {key}, {value} in {var}.items():")
+            lines += self.check(node["additionalProperties"], value, path + [key], indent + 1, loops + 1)
+            return lines
+
+        if (
+            keys == {"type", "patternProperties", "additionalProperties"}
+            and node["additionalProperties"] is False
+            and list(node["patternProperties"]) == [_INT_KEY_PATTERN]
+        ):
+            # Integer-keyed map: keys are strings of digits
+            key, value, bad = self.name("k"), self.name("x"), self.name("b")
+            lines = type_check("object")
+            lines += [
+                f"{pad}{bad} = [k for k in {var} if not (isinstance(k, str) and _INT_KEY.search(k))]",
+                f"{pad}if {bad}:",
+                fail(f"('pattern', {bad})"),
+                f"{pad}for {key}, {value} in {var}.items():",
+            ]
+            sub = node["patternProperties"][_INT_KEY_PATTERN]
+            lines += self.check(sub, value, path + [key], indent + 1, loops + 1)
+            return lines
+
+        if keys <= {"type", "properties", "additionalProperties", "required", "definitions"} and (
+            node.get("additionalProperties") is False and isinstance(node.get("properties"), dict)
+        ):
+            # Named object type
+            properties = node["properties"]
+            allowed = self.const(frozenset(properties))
+            lines = type_check("object")
+            lines += [
+                f"{pad}if not {var}.keys() <= {allowed}:",
+                fail(f"('additional', {allowed})"),
+            ]
+            # One dict.get per property; required ones are all checked before
+            # any value is descended into, so shallow errors come first.
+            values = {prop: self.name("y") for prop in properties}
+            lines += [f"{pad}{values[prop]} = {var}.get({prop!r}, _MISSING)" for prop in properties]
+            required = node.get("required", [])
+            for prop in required:
+                missing = f"{values[prop]} is _MISSING" if prop in values else f"{prop!r} not in {var}"
+                lines += [f"{pad}if {missing}:", fail(repr(f"{prop!r} is a required property"))]
+            for prop, sub in properties.items():
+                if prop in required:
+                    lines += self.check(sub, values[prop], path + [repr(prop)], indent, loops)
+                else:
+                    lines.append(f"{pad}if {values[prop]} is not _MISSING:")
+                    lines += self.check(sub, values[prop], path + [repr(prop)], indent + 1, loops)
+            return lines
+
+        raise UnsupportedSchema(node)
+
+
+def _tuple(path: list[str]) -> str:
+    return f"({', '.join(path)},)" if path else "()"
+
+
+def _run(root: Callable[..., Any], data: Any) -> tuple[str, Any, Any] | None:
+    # Recursive types are validated from an explicit stack rather than by
+    # nested calls, so deeply nested data cannot exhaust the Python stack.
+    # A path link is (parent link, path from parent) and is only flattened
+    # when an error is reported.
+    stack: list[tuple[Callable[..., Any], Any, Any]] = [(root, data, None)]
+    push, pop = stack.append, stack.pop
+    while stack:
+        fn, value, link = pop()
+        error = fn(value, push, link)
+        if error is not None:
+            path = list(error[1])
+            while link is not None:
+                link, steps = link
+                path[:0] = steps
+            return error[0], path, error[2]
+    return None
+
+
+def compile_validator(json_schema: dict[str, Any]) -> Checker:
+    """Generate a checker function for a converted schema.
+
+    Raises UnsupportedSchema if the schema is not one the converter produces.
+    """
+    gen = _Generator(json_schema)
+    root = gen.function(json_schema)
+    gen.emit_functions()
+    namespace = gen.namespace
+    exec(compile("\n\n".join(gen.sources), "<dataspec schema>", "exec"), namespace)
+    return functools.partial(_run, namespace[root])
@@ -0,0 +1,120 @@
+# DataPath parsing and resolution.
+#
+# Kept free of third-party imports and strictly typed so it can be compiled
+# with mypyc (see setup.py).
+from __future__ import annotations
+
+import re
+import functools
+from typing import Any, Callable
+
+# A path segment is an optional name followed by any number of [selector]
+# groups, and must be followed by separators or the end of the path.
+_SEGMENT_RE = re.compile(r"[^./\[\]]*(?:\[[^\]]*\])*(?:[./]+|\Z)")
+_SEGMENT_PARTS_RE = re.compile(r"([^\[]*)((?:\[[^\]]*\])*)")
+_SELECTOR_RE = re.compile(r"\[([^\]]*)\]")
+
+
+def _split_segments(path: str) -> list[str]:
+    tokens: list[str] = _SEGMENT_RE.findall(path)
+    if sum(map(len, tokens)) != len(path):
+        raise ValueError(f"Malformed path: {path}")
+    return [seg for seg in (tok.rstrip("./") for tok in tokens) if seg]
+
+
+def _parse_segment(seg: str) -> tuple[str, list[str]]:
+    m = _SEGMENT_PARTS_RE.fullmatch(seg)
+    if m is None:
+        raise ValueError(f"Malformed segment: {seg}")
+    return m.group(1), _SELECTOR_RE.findall(m.group(2))
+
+
+_INT_LITERAL = re.compile(r"-?\d+")
+# Selector kinds, tried in order: list index, quoted key, field=value filter.
+_SEL_CLASSIFY = re.compile(r"(?P<int>-?\d+)|(?P<str>[\"'].*)|(?P<kv>[^=]*=.*)", re.DOTALL)
+
+
+def _parse_literal(s: str) -> str | int:
+    """Decode a selector literal: a quoted string, an integer or a bare word."""
+    if s[:1] in ("\"", "'"):
+        quote = s[0]
+        if len(s) < 2 or s[-1] != quote:
+            raise ValueError(f"Malformed literal: {s}")
+        body = s[1:-1]
+        if quote == "'":
+            return body.replace("''", "'")
+        if "\\" in body:
+            body = body.encode("latin-1", "backslashreplace").decode("unicode_escape")
+        return body
+    if _INT_LITERAL.fullmatch(s):
+        return int(s)
+    return s
+
+
+_OP_KEY, _OP_INDEX, _OP_FIND = range(3)
+
+
+def _op_key(current: Any, key: str | int) -> Any:
+    if (type(current) is dict or isinstance(current, dict)) and key in current:
+        return current[key]
+    raise KeyError(key)
+
+
+def _op_index(current: Any, idx: int) -> Any:
+    if type(current) is list or isinstance(current, list):
+        return current[idx]
+    raise IndexError(f"Index {idx} on non-list")
+
+
+def _op_find(current: Any, field: str, value: str | int) -> Any:
+    try:
+        return next(
+            item for item in current
+            if (type(item) is dict or isinstance(item, dict)) and item.get(field) == value
+        )
+    except StopIteration:
+        raise KeyError(f"No element with {field}={value}") from None
+
+
+# Indexed by op code. The step functions test `type(x) is dict/list` first, a
+# pointer comparison that succeeds for all parsed YAML/JSON data, and only
+# fall back to isinstance() for subclasses such as OrderedDict.
+_DISPATCH: tuple[Callable[..., Any], ...] = (_op_key, _op_index, _op_find)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_datapath(path: str) -> tuple[bytes, tuple[tuple[Any, ...], ...]]:
+    """Compile a DataPath expression into parallel ``(opcodes, args)`` sequences."""
+    ops = bytearray()
+    args: list[tuple[Any, ...]] = []
+    for raw_seg in _split_segments(path):
+        name, selectors = _parse_segment(raw_seg)
+        if name:
+            ops.append(_OP_KEY)
+            args.append((name,))
+        for sel in selectors:
+            m = _SEL_CLASSIFY.fullmatch(sel)
+            kind = m.lastgroup if m else None
+            if kind == "int":
+                ops.append(_OP_INDEX)
+                args.append((int(sel),))
+            elif kind == "str":
+                ops.append(_OP_KEY)
+                args.append((_parse_literal(sel),))
+            elif kind == "kv":
+                field, value = sel.split("=", 1)
+                ops.append(_OP_FIND)
+                args.append((field, _parse_literal(value)))
+            else:
+                ops.append(_OP_KEY)
+                args.append((sel,))
+    return bytes(ops), tuple(args)
+
+
+def resolve_datapath(data: Any, path: str) -> Any:
+    """Resolve a DataPath expression against data."""
+    ops, args = compile_datapath(path)
+    current = data
+    for op, op_args in zip(ops, args):
+        current = _DISPATCH[op](current, *op_args)
+    return current
@@ -3,7 +3,9 @@ from __future__ import annotations
 import argparse
 import sys
 import yaml
-from . import load_file, load_yaml_or_json, validate, search
+from . import load_file, validate, search
+
+_YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 
 def main(argv: list[str] | None = None) -> None:
@@ -42,7 +44,7 @@ def main(argv: list[str] | None = None) -> None:
         try:
             value = search(data, args.path)
             if isinstance(value, (dict, list)):
-                print(yaml.safe_dump(value, sort_keys=False).rstrip())
+                print(yaml.dump(value, Dumper=_YamlDumper, sort_keys=False).rstrip())
             else:
                 print(value)
         except Exception as ex:
@@ -0,0 +1,16 @@
+# Optional native build: with DATASPEC_USE_MYPYC=1 the DataPath module is
+# compiled to a C extension with mypyc (requires mypy in the build
+# environment, e.g. `pip install mypy && pip install --no-build-isolation .`).
+# Without it the package is installed as pure Python.
+import os
+
+from setuptools import setup
+
+ext_modules = []
+if os.environ.get("DATASPEC_USE_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    # Only _datapath is compiled; the rest of the package is checked silently.
+    ext_modules = mypycify(["--follow-imports=silent", "dataspec/_datapath.py"])
+
+setup(ext_modules=ext_modules)
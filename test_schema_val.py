@@ -1,7 +1,10 @@
+import io
+import json
 import pytest
+import dataspec
 import tempfile
 import os
-from dataspec import validate, load_yaml_or_json, load_file, search
+from dataspec import validate, load_yaml_or_json, load_file, search, compile_datapath, convert_yaml_to_jsonschema, compile_schema, is_valid
 
 # Test data for all supported types according to the Yaml Schema Definition Syntax
 COMPREHENSIVE_SCHEMA_YAML = """
@@ -358,6 +361,12 @@ VALID_DATA_JSON = {
 }
 
 
+@pytest.fixture(scope="module")
+def compiled_schema():
+    """COMPREHENSIVE_SCHEMA_JSON compiled once for all tests in the module"""
+    return compile_schema(COMPREHENSIVE_SCHEMA_JSON)
+
+
 class TestSchemaValidation:
     """Test all supported types in the Yaml Schema Definition Syntax"""
 
@@ -367,19 +376,156 @@ class TestSchemaValidation:
         data = load_yaml_or_json(VALID_DATA_YAML)
         assert validate(data, schema, raise_error=False) is True
 
-    def test_json_schema_json_data(self):
+    def test_json_schema_json_data(self, compiled_schema):
         """Test JSON schema with JSON data"""
-        assert validate(VALID_DATA_JSON, COMPREHENSIVE_SCHEMA_JSON, raise_error=False) is True
+        assert compiled_schema(VALID_DATA_JSON) is True
 
     def test_yaml_schema_json_data(self):
         """Test YAML schema with JSON data"""
         schema = load_yaml_or_json(COMPREHENSIVE_SCHEMA_YAML)
         assert validate(VALID_DATA_JSON, schema, raise_error=False) is True
 
-    def test_json_schema_yaml_data(self):
+    def test_json_schema_yaml_data(self, compiled_schema):
         """Test JSON schema with YAML data"""
         data = load_yaml_or_json(VALID_DATA_YAML)
-        assert validate(data, COMPREHENSIVE_SCHEMA_JSON, raise_error=False) is True
+        assert compiled_schema(data) is True
+
+    def test_load_yaml_or_json_is_cached(self):
+        """Loading the same text twice yields the same object"""
+        schema = load_yaml_or_json(COMPREHENSIVE_SCHEMA_YAML)
+        assert load_yaml_or_json(COMPREHENSIVE_SCHEMA_YAML) is schema
+        assert load_yaml_or_json('{"a": [1]}') == {"a": [1]}
+
+        private = load_yaml_or_json(COMPREHENSIVE_SCHEMA_YAML, copy=True)
+        assert private == schema and private is not schema
+        private["<<root>>"].clear()
+        assert load_yaml_or_json(COMPREHENSIVE_SCHEMA_YAML) is schema
+        assert schema["<<root>>"]
+
+    def test_load_yaml_or_json_json_fast_path(self):
+        """JSON text goes through the JSON parser, YAML flow mappings fall back to YAML"""
+        assert load_yaml_or_json('  [1, 2.5, "x"]') == [1, 2.5, "x"]
+        assert load_yaml_or_json("{a: 1, b: [x, y]}") == {"a": 1, "b": ["x", "y"]}
+        assert load_yaml_or_json(b"a: 1") == {"a": 1}
+        assert load_yaml_or_json(b' {"a": [1]}') == {"a": [1]}
+        assert load_yaml_or_json("{a: 1}".encode("utf-16")) == {"a": 1}
+
+    def test_conversion_is_cached(self):
+        """Converting the same schema object twice yields the same JSON Schema"""
+        json_schema = convert_yaml_to_jsonschema(COMPREHENSIVE_SCHEMA_JSON)
+        assert convert_yaml_to_jsonschema(COMPREHENSIVE_SCHEMA_JSON) is json_schema
+        assert validate(VALID_DATA_JSON, json_schema, raise_error=False) is True
+
+    def test_conversion_inlines_non_recursive_refs(self):
+        """Non-recursive named types are inlined, recursive ones stay as $ref"""
+        schema = {
+            "<<root>>": {"node": {"$ref": "#/Node"}},
+            "Node": {
+                "properties": {
+                    "label": {"$ref": "#/Label"},
+                    "children": {"type": "array", "items": {"$ref": "#/Node"}},
+                }
+            },
+            "Label": {"properties": {"text": {"type": "string"}}},
+        }
+        json_schema = convert_yaml_to_jsonschema(schema)
+        node = json_schema["definitions"]["Node"]
+        assert node["properties"]["label"]["properties"]["text"] == {"type": "string"}
+        assert node["properties"]["children"]["items"] == {"$ref": "#/definitions/Node"}
+        assert json_schema["properties"]["node"] == {"$ref": "#/definitions/Node"}
+        data = {"node": {"label": {"text": "a"}, "children": [{"label": {"text": 1}, "children": []}]}}
+        result = validate(data, schema, raise_error=False)
+        assert "node -> children -> 0 -> label -> text" in result
+
+    def test_conversion_inlining_is_bounded(self):
+        """Nested inlining stays small and long chains convert without recursion"""
+        schema = {"<<root>>": {"d": {"$ref": "#/D0"}}, "D12": {"properties": {"leaf": {"type": "string"}}}}
+        for i in range(12):
+            schema[f"D{i}"] = {"properties": {f"p{j}": {"$ref": f"#/D{i + 1}"} for j in range(3)}}
+        assert len(json.dumps(convert_yaml_to_jsonschema(schema))) < 100_000
+        schema = {"<<root>>": {"d": {"$ref": "#/D0"}}, "D1000": {"properties": {"leaf": {"type": "string"}}}}
+        for i in range(1000):
+            schema[f"D{i}"] = {"properties": {"next": {"$ref": f"#/D{i + 1}"}}}
+        json_schema = convert_yaml_to_jsonschema(schema)
+        assert len(json_schema["definitions"]) == 1001
+
+    def test_compile_schema(self, compiled_schema):
+        """Compiled schemas validate like validate(raise_error=False)"""
+        invalid = {"test_data": dict(VALID_DATA_JSON["test_data"], matrix=[[1, "x"]])}
+        result = compiled_schema(invalid)
+        assert "'x' is not of type 'number'" in result
+        assert "test_data -> matrix -> 0 -> 1" in result
+        assert result == validate(invalid, COMPREHENSIVE_SCHEMA_JSON, raise_error=False)
+
+    def test_deeply_nested_recursive_data(self):
+        """Recursive types validate data nested deeper than the recursion limit"""
+        schema = {
+            "<<root>>": {"node": {"$ref": "#/Node"}},
+            "Node": {"properties": {"children": {"type": "array", "items": {"$ref": "#/Node"}}}},
+        }
+        data = node = {"children": []}
+        for _ in range(5000):
+            child = {"children": []}
+            node["children"].append(child)
+            node = child
+        assert validate({"node": data}, schema, raise_error=False) is True
+        node["children"].append({"children": 1})
+        result = validate({"node": data}, schema, raise_error=False)
+        assert "1 is not of type 'array'" in result
+        assert result.count("children -> 0") == 5001
+
+    def test_shared_definitions_compile_linearly(self):
+        """Definitions reused along a chain are not expanded once per path"""
+        schema = {"<<root>>": {"d": {"$ref": "#/D0"}}, "D12": {"properties": {"leaf": {"type": "string"}}}}
+        for i in range(12):
+            props = {f"p{j}": {"$ref": f"#/D{i + 1}", "optional": j > 0} for j in range(3)}
+            schema[f"D{i}"] = {"properties": props}
+        check = compile_schema(schema)
+        data = {"leaf": "x"}
+        for _ in range(12):
+            data = {"p0": data}
+        assert check({"d": data}) is True
+        data["p0"]["p2"] = {"p0": {}}
+        assert "'p0' is a required property" in check({"d": data})
+
+    def test_deeply_nested_schema(self):
+        """Schemas nested deeper than Python's block limit still compile"""
+        array = {"type": "integer"}
+        map_ = {"type": "string"}
+        data_array, data_map = 1, "x"
+        for _ in range(25):
+            array = {"type": "array", "items": array}
+            map_ = {"type": "map", "keys": {"type": "string"}, "values": map_}
+            data_array, data_map = [data_array], {"k": data_map}
+        schema = {"<<root>>": {"a": array, "m": map_}}
+        assert validate({"a": data_array, "m": data_map}, schema, raise_error=False) is True
+        result = validate({"a": data_array, "m": {"k": 1}}, schema, raise_error=False)
+        assert "1 is not of type 'object'" in result
+        schema = {"<<root>>": {"d": {"$ref": "#/D0"}}, "D300": {"properties": {"leaf": {"type": "string"}}}}
+        data = {"leaf": "x"}
+        for i in range(300):
+            schema[f"D{i}"] = {"properties": {"next": {"$ref": f"#/D{i + 1}"}}}
+            data = {"next": data}
+        assert validate({"d": data}, schema, raise_error=False) is True
+
+    def test_fast_validation_backend(self, monkeypatch):
+        """DATASPEC_FAST=1 uses fastjsonschema where it supports the schema"""
+        pytest.importorskip("fastjsonschema")
+        monkeypatch.setattr(dataspec, "_FAST_VALIDATION", True)
+        monkeypatch.setattr(dataspec, "_CHECKER_CACHE", type(dataspec._CHECKER_CACHE)())
+        schema = {
+            "type": "object",
+            "properties": {"items": {"type": "array", "items": {"type": "integer"}}},
+        }
+        assert validate({"items": [1, 2]}, schema, raise_error=False) is True
+        result = validate({"items": [1, "x"]}, schema, raise_error=False)
+        assert "must be integer" in result
+        assert "Location: items -> 1\n" in result
+
+        # Unsupported keywords fall back to jsonschema
+        schema = {"type": "object", "unevaluatedProperties": False}
+        result = validate({"a": 1}, schema, raise_error=False)
+        assert "Unevaluated properties are not allowed" in result
 
     def test_primitive_types(self):
         """Test all primitive types"""
@@ -421,6 +567,19 @@ class TestSchemaValidation:
         
         assert validate(valid_data, schema, raise_error=False) is True
 
+    def test_long_primitive_arrays(self):
+        """Long arrays of primitives keep JSON Schema's number semantics"""
+        schema = {"<<root>>": {"values": {"type": "array", "items": {"type": "integer"}}}}
+        assert validate({"values": list(range(100)) + [7.0]}, schema, raise_error=False) is True
+        result = validate({"values": list(range(100)) + [True]}, schema, raise_error=False)
+        assert "True is not of type 'integer'" in result
+        assert "values -> 100" in result
+        schema = {"<<root>>": {"matrix": {"type": "array", "items": {"type": "array", "items": {"type": "number"}}}}}
+        matrix = [[1.5, 2, 3] for _ in range(50)]
+        assert validate({"matrix": matrix}, schema, raise_error=False) is True
+        matrix[40][1] = "x"
+        assert "matrix -> 40 -> 1" in validate({"matrix": matrix}, schema, raise_error=False)
+
     def test_map_types(self):
         """Test map/dictionary types"""
         schema = {
@@ -513,6 +672,31 @@ class TestSchemaValidation:
         result = validate(invalid_data, schema, raise_error=False)
         assert result is not True
         assert "Additional properties are not allowed" in result
+        assert is_valid(invalid_data, schema) is False
+        assert is_valid({"known_field": "value"}, schema) is True
+
+    def test_error_snippet_is_truncated(self):
+        """The data snippet keeps 8 items per level and 3 levels"""
+        data = {"nested": {"b": {"c": {"d": 1}}}, "items": list(range(10))}
+        data.update((f"k{i}", i) for i in range(7))
+        result = validate(data, {"type": "string"}, raise_error=False)
+        snippet = json.loads(result.split("Data snippet: ", 1)[1])
+        assert list(snippet) == ["nested", "items", "k0", "k1", "k2", "k3", "k4", "k5", "__truncated__"]
+        assert snippet["nested"] == {"b": {"c": {"__truncated__": True}}}
+        assert snippet["items"] == [0, 1, 2, 3, 4, 5, 6, 7, "..."]
+
+    def test_error_message_is_bounded(self):
+        """Large failing values are abbreviated in the message line"""
+        big = {f"k{i}": list(range(100)) for i in range(10000)}
+        schema = {"<<root>>": {"a": {"type": "string"}}}
+        assert is_valid({"a": big}, schema) is False
+        message = validate({"a": big}, schema, raise_error=False).splitlines()[0]
+        assert len(message) < 400
+        assert message.endswith("...} is not of type 'string'")
+        assert message.startswith("Validation failed: {'k0': [0, 1, 2, 3, 4, 5, 6, 7, ...], 'k1'")
+        message = validate(big, schema, raise_error=False).splitlines()[0]
+        assert len(message) < 400
+        assert "'k0', 'k1', 'k10', 'k100', 'k1000', 'k1001', 'k1002', 'k1003', ... were unexpected" in message
 
     def test_invalid_map_wrong_key_type(self):
         """Test map validation fails with wrong key type"""
@@ -553,10 +737,47 @@ class TestSchemaValidation:
 
             assert validate(data, schema, raise_error=False) is True
 
+    def test_file_object_validation(self):
+        """Test loading schema and data from file objects"""
+        schema = load_file(io.StringIO(COMPREHENSIVE_SCHEMA_YAML))
+        data = load_file(io.BytesIO(VALID_DATA_YAML.encode()), force_format="yaml")
+        assert validate(data, schema, raise_error=False) is True
+
+    def test_json_edge_values(self):
+        """NaN, Infinity and integers beyond 64 bits behave as with the json module"""
+        data = load_file(io.BytesIO(b'{"a": NaN, "b": Infinity}'), force_format="json")
+        assert data["b"] == float("inf")
+        assert load_yaml_or_json("[NaN]")[0] != load_yaml_or_json("[NaN]")[0]
+        assert load_yaml_or_json("[123456789012345678901234567890]") == [123456789012345678901234567890]
+        data = load_file(io.BytesIO(b'{"n": -98765432109876543210}'), force_format="json")
+        assert data["n"] == -98765432109876543210
+        schema = {"<<root>>": {"a": {"type": "string"}}}
+        result = validate({"a": 2**70}, schema, raise_error=False)
+        assert "Location: a" in result
+        assert str(2**70) in result
+
     def test_search_function(self):
         data = load_yaml_or_json(VALID_DATA_YAML)
         assert search(data, 'test_data.matrix[0][1]') == 2
 
+    def test_search_quoted_selectors(self):
+        data = load_yaml_or_json(VALID_DATA_YAML)
+        assert search(data, 'test_data.people_by_id["emp001"].full_name') == "Alice Smith"
+        assert search(data, "test_data.team_members[id='tm002'].full_name") == "Diana Prince"
+        assert search({"a\tb": 1}, r'["a\tb"]') == 1
+
+    def test_compile_datapath_is_cached(self):
+        path = "test_data.team_members[id='tm001'].skills[-1]"
+        assert compile_datapath(path) is compile_datapath(path)
+        data = load_yaml_or_json(VALID_DATA_YAML)
+        assert search(data, path) == "kubernetes"
+
+    def test_search_malformed_path(self):
+        data = load_yaml_or_json(VALID_DATA_YAML)
+        for path in ("test_data.matrix[0", "test_data.matrix[0]x", "test_data]"):
+            with pytest.raises(ValueError):
+                search(data, path)
+
 
 if __name__ == "__main__":
     pytest.main([__file__])